@@ -4,6 +4,7 @@ import zipfile
 import tempfile
 from src.PostmileSegmentExtractor import PostmileSegmentExtractor
 from src.MapPlotter import plotting_map
+from src.SegmentStatistics import catalog_statistics
 
 
 output_path = "data"
@@ -140,8 +141,8 @@ with st.sidebar:
             dataPath="data",
         )
 
-        min_pm = temp_extractor.SHNPointGdf["PM"].min()
-        max_pm = temp_extractor.SHNPointGdf["PM"].max()
+        min_pm = temp_extractor.route.pm.min()
+        max_pm = temp_extractor.route.pm.max()
 
         col1, col2 = st.sidebar.columns(2)
 
@@ -252,8 +253,8 @@ try:
 
         with col2:
             st.subheader("Postmile Range")
-            min_pm = extractor.SHNPointGdf["PM"].min()
-            max_pm = extractor.SHNPointGdf["PM"].max()
+            min_pm = extractor.route.pm.min()
+            max_pm = extractor.route.pm.max()
             st.write(f"- Start PM: {min_pm:.1f}")
             st.write(f"- End PM: {max_pm:.1f}")
 
@@ -332,7 +333,9 @@ try:
         with col4:
             st.subheader("Split Point Data")
             st.dataframe(
-                splitted_point_gdf[["PM", "County", "Route", "Direction"]],
+                splitted_point_gdf[
+                    ["PMPrefix", "PM", "PMSuffix", "County", "Route", "Direction"]
+                ],
                 hide_index=True,
             )
 
@@ -381,6 +384,29 @@ try:
                 help="Download Splitted Point as Zipped Shapefile",
             )
 
+        st.subheader("Segment Statistics")
+
+        parts_df = extractor.parts_df
+        stats_row = splitted_result_gdf.iloc[0]
+
+        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4)
+        metric_col1.metric("Length (mi)", f"{stats_row['length_mi']:.3f}")
+        metric_col2.metric("Parts", int(stats_row["parts"]))
+        metric_col3.metric("Vertices", int(stats_row["vertices"]))
+        metric_col4.metric("Gap (mi)", f"{stats_row['gap_mi']:.3f}")
+
+        st.dataframe(parts_df, hide_index=True)
+
+        st.download_button(
+            label="Download Part Statistics (CSV)",
+            data=parts_df.to_csv(index=False).encode("utf-8"),
+            file_name=(
+                f"splitted_stats_d{district}_{county}_{route}_{direction}_{start_pm_confirmed:.1f}_{end_pm_confirmed:.1f}.csv"
+            ),
+            mime="text/csv",
+            help="Download length, vertex count and gap of each part in CSV Format",
+        )
+
         st.subheader("Route Map")
 
         try:
@@ -404,7 +430,16 @@ try:
                 with tab2:
                     st.subheader("Point Data")
                     st.dataframe(
-                        splitted_point_gdf[["PM", "County", "Route", "Direction"]],
+                        splitted_point_gdf[
+                            [
+                                "PMPrefix",
+                                "PM",
+                                "PMSuffix",
+                                "County",
+                                "Route",
+                                "Direction",
+                            ]
+                        ],
                         hide_index=True,
                     )
 
@@ -415,3 +450,23 @@ try:
 
 except Exception as e:
     st.error(f"Error loading data: {str(e)}")
+
+
+@st.cache_data
+def get_catalog_statistics(dataPath="data"):
+    return catalog_statistics(dataPath=dataPath)
+
+
+with st.expander("Catalog Statistics"):
+    try:
+        catalog_df = get_catalog_statistics("data")
+        st.dataframe(catalog_df, hide_index=True)
+        st.download_button(
+            label="Download Catalog Statistics (CSV)",
+            data=catalog_df.to_csv(index=False).encode("utf-8"),
+            file_name="catalog_stats.csv",
+            mime="text/csv",
+            help="Download length statistics of every route in CSV Format",
+        )
+    except Exception as e:
+        st.error(f"Error computing catalog statistics: {str(e)}")
@@ -0,0 +1,212 @@
+"""
+Compare the CompactRoute based extractor against the previous GeoDataFrame
+based one: memory per loaded route, cut latency and cut geometry.
+
+Run from the repository root:
+
+    uv run python -m benchmarks.compact_route_benchmark
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+import geopandas as gpd
+import numpy as np
+from pathlib import Path
+from shapely.geometry import LineString, MultiLineString
+from src.PostmileSegmentExtractor import PostmileSegmentExtractor
+
+DATA_PATH = "data"
+
+
+class LegacyPostmileSegmentExtractor:
+    """
+    The previous extractor: keeps the full line / point GeoDataFrames and
+    cuts with a per-edge shapely loop.
+    """
+
+    def __init__(self, district, county, route, direction, dataPath=DATA_PATH):
+        self.SHNLineGdf = gpd.read_file(
+            Path(dataPath)
+            / "line"
+            / f"d{district}"
+            / f"{county}_route_{route}_{direction}.geojson"
+        )
+        self.SHNPointGdf = gpd.read_file(
+            Path(dataPath)
+            / "point"
+            / f"d{district}"
+            / f"{county}_pm_{route}_{direction}.geojson"
+        )
+
+    def cut_line_by_points(self, start_pm, end_pm):
+        points_gdf = self.SHNPointGdf[
+            (self.SHNPointGdf["PM"] >= start_pm) & (self.SHNPointGdf["PM"] <= end_pm)
+        ]
+        points_gdf = points_gdf.sort_values(["PM", "Odometer"])
+        start_point = points_gdf.iloc[0].geometry
+        end_point = points_gdf.iloc[-1].geometry
+
+        original_line = self.SHNLineGdf.geometry.iloc[0]
+        lines = (
+            original_line.geoms
+            if isinstance(original_line, MultiLineString)
+            else [original_line]
+        )
+
+        cut_segments = []
+        for line_segment in lines:
+            coords = list(line_segment.coords)
+            start_dist = end_dist = float("inf")
+            start_idx = end_idx = 0
+            start_proj = end_proj = None
+
+            for i in range(len(coords) - 1):
+                segment = LineString([coords[i], coords[i + 1]])
+
+                dist_to_start = segment.distance(start_point)
+                if dist_to_start < start_dist:
+                    start_dist = dist_to_start
+                    start_idx = i
+                    start_proj = segment.interpolate(segment.project(start_point))
+
+                dist_to_end = segment.distance(end_point)
+                if dist_to_end < end_dist:
+                    end_dist = dist_to_end
+                    end_idx = i
+                    end_proj = segment.interpolate(segment.project(end_point))
+
+            if start_proj is not None and end_proj is not None:
+                if start_idx > end_idx:
+                    start_idx, end_idx = end_idx, start_idx
+                    start_proj, end_proj = end_proj, start_proj
+                cut_segments.append(
+                    LineString(
+                        [(start_proj.x, start_proj.y)]
+                        + coords[start_idx + 1 : end_idx + 1]
+                        + [(end_proj.x, end_proj.y)]
+                    )
+                )
+
+        return cut_segments, points_gdf.iloc[[0, -1]].copy()
+
+
+def find_routes(dataPath=DATA_PATH):
+    routes = []
+    for line_file in sorted((Path(dataPath) / "line").glob("d*/*_route_*.geojson")):
+        county, _, route, direction = line_file.stem.split("_")[:4]
+        district = line_file.parent.name.replace("d", "")
+        routes.append((district, county, route, direction))
+    return routes
+
+
+def traced_bytes(build):
+    """
+    Python-level bytes still allocated after build(). Memory held by GEOS
+    geometries is not traced, so the legacy figure is a lower bound.
+    """
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, current
+
+
+def run(dataPath=DATA_PATH, cuts_per_route=10, seed=0):
+    rng = random.Random(seed)
+
+    legacy_bytes = compact_bytes = 0
+    legacy_array_bytes = compact_array_bytes = 0
+    legacy_seconds = compact_seconds = 0.0
+    worst_hausdorff = 0.0
+    n_cuts = 0
+
+    routes = find_routes(dataPath)
+
+    # warm up readers and CRS caches so they are not charged to the first route
+    LegacyPostmileSegmentExtractor(*routes[0], dataPath=dataPath)
+    PostmileSegmentExtractor(*routes[0], dataPath=dataPath)
+
+    for key in routes:
+        legacy, legacy_size = traced_bytes(
+            lambda: LegacyPostmileSegmentExtractor(*key, dataPath=dataPath)
+        )
+        compact, compact_size = traced_bytes(
+            lambda: PostmileSegmentExtractor(*key, dataPath=dataPath)
+        )
+        legacy_bytes += legacy_size
+        compact_bytes += compact_size
+
+        # column / array payload only; GEOS geometries are not counted
+        legacy_array_bytes += (
+            legacy.SHNLineGdf.memory_usage(deep=True).sum()
+            + legacy.SHNPointGdf.memory_usage(deep=True).sum()
+        )
+        compact_array_bytes += compact.route.nbytes
+
+        pms = list(compact.route.pm)
+        for _ in range(cuts_per_route):
+            start_pm, end_pm = sorted(rng.sample(pms, 2))
+
+            started = time.perf_counter()
+            legacy_segments, legacy_points = legacy.cut_line_by_points(start_pm, end_pm)
+            legacy_seconds += time.perf_counter() - started
+
+            # includes the segment statistics and building the output GeoDataFrames
+            started = time.perf_counter()
+            result_gdf, point_gdf = compact.cut_line_by_points(start_pm, end_pm)
+            compact_seconds += time.perf_counter() - started
+
+            # the compact cut leaves out parts that collapse outside the PM
+            # range, unless every part collapses (single PM point ranges)
+            kept_segments = [
+                segment for segment in legacy_segments if segment.length > 0
+            ]
+            if not kept_segments:
+                start_point = legacy_points.geometry.iloc[0]
+                kept_segments = [
+                    min(legacy_segments, key=lambda line: line.distance(start_point))
+                ]
+            legacy_segments = kept_segments
+            legacy_geometry = (
+                MultiLineString(legacy_segments)
+                if len(legacy_segments) > 1
+                else legacy_segments[0]
+            )
+            worst_hausdorff = max(
+                worst_hausdorff,
+                legacy_geometry.hausdorff_distance(result_gdf.geometry.iloc[0]),
+            )
+            assert np.allclose(legacy_points["PM"], point_gdf["PM"])
+            n_cuts += 1
+
+    n_routes = len(routes)
+    print(f"Routes: {n_routes}, cuts: {n_cuts}")
+    print(
+        f"Memory per route (KB): legacy {legacy_bytes / n_routes / 1024:.1f}, "
+        f"compact {compact_bytes / n_routes / 1024:.1f}"
+    )
+    print(
+        f"Column / array memory per route (KB): "
+        f"legacy {legacy_array_bytes / n_routes / 1024:.1f}, "
+        f"compact {compact_array_bytes / n_routes / 1024:.1f}"
+    )
+    print(
+        f"Cut latency (ms): legacy {legacy_seconds / n_cuts * 1e3:.2f}, "
+        f"compact {compact_seconds / n_cuts * 1e3:.2f}"
+    )
+    print(f"Max Hausdorff distance between cut geometries: {worst_hausdorff:g}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DATA_PATH, help="Data directory")
+    parser.add_argument("--cuts", type=int, default=10, help="Random cuts per route")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    run(dataPath=args.data, cuts_per_route=args.cuts, seed=args.seed)
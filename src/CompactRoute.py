@@ -0,0 +1,245 @@
+import numpy as np
+import geopandas as gpd
+from shapely.geometry import LineString, MultiLineString
+from src.SegmentStatistics import flatten_lines, pm_codes
+
+
+class CompactRoute:
+    """
+    Lightweight in-memory representation of one route / direction.
+
+    Only what the cut needs is kept: the line as a flat float64 coordinate
+    array with part offsets, and the postmile points as flat PM / Odometer /
+    coordinate arrays, plus the PM prefix / suffix so exported points stay
+    unambiguous. GeoDataFrames are built only on export.
+    """
+
+    __slots__ = (
+        "district",
+        "county",
+        "route",
+        "direction",
+        "crs",
+        "coords",
+        "offsets",
+        "pm",
+        "pm_prefix",
+        "pm_suffix",
+        "odometer",
+        "point_coords",
+    )
+
+    def __init__(
+        self,
+        district,
+        county,
+        route,
+        direction,
+        crs,
+        coords,
+        offsets,
+        pm,
+        pm_prefix,
+        pm_suffix,
+        odometer,
+        point_coords,
+    ):
+        self.district = district
+        self.county = county
+        self.route = route
+        self.direction = direction
+        self.crs = crs
+        self.coords = coords
+        self.offsets = offsets
+        self.pm = pm
+        self.pm_prefix = pm_prefix
+        self.pm_suffix = pm_suffix
+        self.odometer = odometer
+        self.point_coords = point_coords
+
+    @classmethod
+    def from_gdfs(cls, lineGdf, pointGdf):
+        """
+        Build a CompactRoute from the SHN line and PM point GeoDataFrames.
+        """
+        if pointGdf.crs is not None and pointGdf.crs != lineGdf.crs:
+            pointGdf = pointGdf.to_crs(lineGdf.crs)
+
+        # the cut only ever uses the first line feature
+        coords, offsets, _ = flatten_lines(lineGdf.geometry.iloc[0])
+
+        first_point = pointGdf.iloc[0]
+        return cls(
+            district=first_point["District"],
+            county=first_point["County"],
+            route=first_point["Route"],
+            direction=first_point["Direction"],
+            crs=lineGdf.crs,
+            coords=np.ascontiguousarray(coords, dtype=np.float64),
+            offsets=offsets,
+            pm=pointGdf["PM"].to_numpy(dtype=np.float64),
+            pm_prefix=pm_codes(pointGdf, "PMPrefix"),
+            pm_suffix=pm_codes(pointGdf, "PMSuffix"),
+            odometer=pointGdf["Odometer"].to_numpy(dtype=np.float64),
+            point_coords=np.column_stack(
+                [pointGdf.geometry.x.to_numpy(), pointGdf.geometry.y.to_numpy()]
+            ),
+        )
+
+    @classmethod
+    def from_files(cls, lineFilePath, pointFilePath):
+        return cls.from_gdfs(gpd.read_file(lineFilePath), gpd.read_file(pointFilePath))
+
+    @property
+    def nbytes(self):
+        """Bytes held by the coordinate and attribute arrays."""
+        return sum(
+            array.nbytes
+            for array in (
+                self.coords,
+                self.offsets,
+                self.pm,
+                self.pm_prefix,
+                self.pm_suffix,
+                self.odometer,
+                self.point_coords,
+            )
+        )
+
+    def parts(self):
+        """Yield the coordinate array of each line part."""
+        for start, end in zip(self.offsets[:-1], self.offsets[1:]):
+            yield self.coords[start:end]
+
+    def cut(self, start_pm, end_pm):
+        """
+        根據起點和終點切割線段，保持不連續線段的間隔
+
+        返回:
+        CompactSegment: 切割後的線段座標與起終點索引
+        """
+        # 篩選指定 PM 範圍內的點，並按照 PM、Odometer 排序
+        in_range = np.flatnonzero((self.pm >= start_pm) & (self.pm <= end_pm))
+        if len(in_range) == 0:
+            raise ValueError(f"No postmile points between PM {start_pm} and {end_pm}")
+        order = in_range[np.lexsort((self.odometer[in_range], self.pm[in_range]))]
+        start_idx, end_idx = order[0], order[-1]
+
+        start_point = self.point_coords[start_idx]
+        end_point = self.point_coords[end_idx]
+
+        cut_parts = []
+        collapsed_parts = []
+        for part in self.parts():
+            if len(part) < 2:
+                continue
+            cut_part = _cut_part(part, start_point, end_point)
+            # parts outside the PM range collapse onto a single vertex
+            if np.all(cut_part == cut_part[0]):
+                collapsed_parts.append(cut_part)
+                continue
+            cut_parts.append(cut_part)
+
+        # a range with a single PM point collapses every part; keep the
+        # zero-length part closest to that point
+        if not cut_parts and collapsed_parts:
+            cut_parts = [
+                min(
+                    collapsed_parts,
+                    key=lambda part: np.sum((part[0] - start_point) ** 2),
+                )
+            ]
+
+        if not cut_parts:
+            raise ValueError("未找到包含起點和終點的有效線段")
+
+        counts = np.array([len(part) for part in cut_parts], dtype=np.int64)
+        offsets = np.zeros(len(cut_parts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return CompactSegment(
+            route=self,
+            coords=np.concatenate(cut_parts),
+            offsets=offsets,
+            point_index=np.array([start_idx, end_idx]),
+        )
+
+
+class CompactSegment:
+    """
+    Result of CompactRoute.cut: cut line parts plus the start / end PM points.
+    """
+
+    __slots__ = ("route", "coords", "offsets", "point_index")
+
+    def __init__(self, route, coords, offsets, point_index):
+        self.route = route
+        self.coords = coords
+        self.offsets = offsets
+        self.point_index = point_index
+
+    @property
+    def start_pm(self):
+        return self.route.pm[self.point_index[0]]
+
+    @property
+    def end_pm(self):
+        return self.route.pm[self.point_index[-1]]
+
+    def geometry(self):
+        """LineString, or MultiLineString if the cut spans several parts."""
+        lines = [
+            LineString(self.coords[start:end])
+            for start, end in zip(self.offsets[:-1], self.offsets[1:])
+        ]
+        return MultiLineString(lines) if len(lines) > 1 else lines[0]
+
+    def to_point_gdf(self):
+        route = self.route
+        index = self.point_index
+        return gpd.GeoDataFrame(
+            {
+                "District": route.district,
+                "County": route.county,
+                "Route": route.route,
+                "Direction": route.direction,
+                "PMPrefix": route.pm_prefix[index],
+                "PM": route.pm[index],
+                "PMSuffix": route.pm_suffix[index],
+                "Odometer": route.odometer[index],
+            },
+            geometry=gpd.points_from_xy(
+                route.point_coords[index, 0], route.point_coords[index, 1]
+            ),
+            crs=route.crs,
+        )
+
+
+def _cut_part(part, start_point, end_point):
+    """
+    Cut one line part between the projections of the start and end points
+    onto their nearest edges.
+    """
+    seg_start = part[:-1]
+    seg_vector = part[1:] - seg_start
+    seg_length_sq = np.einsum("ij,ij->i", seg_vector, seg_vector)
+    # zero-length edges project every point onto their start vertex
+    safe_length_sq = np.where(seg_length_sq > 0, seg_length_sq, 1.0)
+
+    def nearest(point):
+        t = np.einsum("ij,ij->i", point - seg_start, seg_vector) / safe_length_sq
+        t = np.clip(np.where(seg_length_sq > 0, t, 0.0), 0.0, 1.0)
+        projected = seg_start + t[:, None] * seg_vector
+        dist_sq = np.einsum("ij,ij->i", point - projected, point - projected)
+        idx = int(np.argmin(dist_sq))
+        return idx, projected[idx]
+
+    start_idx, start_proj = nearest(start_point)
+    end_idx, end_proj = nearest(end_point)
+
+    # 確保起點在終點之前
+    if start_idx > end_idx:
+        start_idx, end_idx = end_idx, start_idx
+        start_proj, end_proj = end_proj, start_proj
+
+    return np.vstack([start_proj, part[start_idx + 1 : end_idx + 1], end_proj])
@@ -1,7 +1,11 @@
 import geopandas as gpd
-from shapely.ops import split, linemerge, substring
-from shapely.geometry import Point, LineString, MultiLineString
 from pathlib import Path
+from src.CompactRoute import CompactRoute
+from src.SegmentStatistics import (
+    endpoint_measures,
+    part_arrays,
+    statistics_frames,
+)
 
 DATA_PATH = "data"
 
@@ -38,8 +42,9 @@ class PostmileSegmentExtractor:
             / f"d{district}"
             / f"{county}_pm_{route}_{direction}.geojson"
         )
-        self.SHNLineGdf = gpd.read_file(self.lineFilePath)
-        self.SHNPointGdf = gpd.read_file(self.pointFilePath)
+        self.route = CompactRoute.from_files(self.lineFilePath, self.pointFilePath)
+        # 最近一次切割的各部分統計，依路線順序
+        self.parts_df = None
 
     # works for discontinuous and continuous lines 03062025
 
@@ -48,114 +53,48 @@ class PostmileSegmentExtractor:
         根據起點和終點切割線段，保持不連續線段的間隔
 
         參數:
-
+        start_pm: 起點 PM
+        end_pm: 終點 PM
 
         返回:
         GeoDataFrame: 包含切割後線段的 GeoDataFrame
+        GeoDataFrame: 起點和終點的 GeoDataFrame
+        各部分的統計另存於 self.parts_df
         """
-
-        # 篩選指定 PM 範圍內的點
-        points_gdf = self.SHNPointGdf[
-            (self.SHNPointGdf["PM"] >= start_pm) & (self.SHNPointGdf["PM"] <= end_pm)
-        ]
-        # # 讀取線段和點的 GeoJSON 檔案
-        # line_gdf = gpd.read_file(line_geojson)
-        # points_gdf = gpd.read_file(points_geojson)
-
-        # 確保點按照 PM 值排序
-        points_gdf = points_gdf.sort_values(["PM", "Odometer"])
-        start_point = points_gdf.iloc[0].geometry
-        end_point = points_gdf.iloc[-1].geometry
-
-        # 獲取線段幾何
-        original_line = self.SHNLineGdf.geometry.iloc[0]
-
-        def process_line_segment(line_segment, start_point, end_point):
-            """處理單個線段"""
-            coords = list(line_segment.coords)
-
-            # 找到最接近起點和終點的位置
-            start_dist = float("inf")
-            end_dist = float("inf")
-            start_idx = 0
-            end_idx = 0
-            start_proj = None
-            end_proj = None
-
-            # 遍歷每個線段找最近點
-            for i in range(len(coords) - 1):
-                segment = LineString([coords[i], coords[i + 1]])
-
-                # 檢查起點
-                dist_to_start = segment.distance(start_point)
-                if dist_to_start < start_dist:
-                    start_dist = dist_to_start
-                    start_idx = i
-                    start_proj = segment.interpolate(segment.project(start_point))
-
-                # 檢查終點
-                dist_to_end = segment.distance(end_point)
-                if dist_to_end < end_dist:
-                    end_dist = dist_to_end
-                    end_idx = i
-                    end_proj = segment.interpolate(segment.project(end_point))
-
-            # 如果這個線段包含了起點或終點，返回切割後的部分
-            if start_proj is not None and end_proj is not None:
-                # 確保起點在終點之前
-                if start_idx > end_idx:
-                    start_idx, end_idx = end_idx, start_idx
-                    start_proj, end_proj = end_proj, start_proj
-
-                new_coords = []
-                new_coords.append((start_proj.x, start_proj.y))
-                new_coords.extend(coords[start_idx + 1 : end_idx + 1])
-                new_coords.append((end_proj.x, end_proj.y))
-
-                return LineString(new_coords)
-
-            return None
-
         try:
-            cut_segments = []
-
-            # 如果是 MultiLineString，分別處理每個線段
-            if isinstance(original_line, MultiLineString):
-                for line_segment in original_line.geoms:
-                    result = process_line_segment(line_segment, start_point, end_point)
-                    if result is not None:
-                        cut_segments.append(result)
-            else:
-                # 單一 LineString 的情況
-                result = process_line_segment(original_line, start_point, end_point)
-                if result is not None:
-                    cut_segments.append(result)
-
-            if not cut_segments:
-                raise ValueError("未找到包含起點和終點的有效線段")
-
-            # 創建 MultiLineString（如果有多個線段）或 LineString（如果只有一個線段）
-            final_geometry = (
-                MultiLineString(cut_segments)
-                if len(cut_segments) > 1
-                else cut_segments[0]
+            segment = self.route.cut(start_pm, end_pm)
+
+            # 計算長度、頂點數與不連續線段間隔
+            part_measure = endpoint_measures(
+                segment.coords,
+                segment.offsets,
+                self.route.point_coords,
+                self.route.odometer,
+            )
+            _, vertices, lengths, gaps = part_arrays(
+                segment.coords, segment.offsets, self.route.crs, part_measure
             )
+            stats, self.parts_df = statistics_frames(vertices, lengths, gaps)
 
-            # 創建新的 GeoDataFrame，保持原始 CRS
+            # 只在輸出時建立 GeoDataFrame，保持原始 CRS
             splitted_result_gdf = gpd.GeoDataFrame(
                 {
-                    "District": [self.SHNPointGdf.iloc[0]["District"]],
-                    "County": [self.SHNPointGdf.iloc[0]["County"]],
-                    "Route": [self.SHNPointGdf.iloc[0]["Route"]],
-                    "Direction": [self.SHNPointGdf.iloc[0]["Direction"]],
-                    "start_pm": [points_gdf.iloc[0]["PM"]],
-                    "end_pm": [points_gdf.iloc[-1]["PM"]],
-                    "geometry": [final_geometry],
+                    "District": [self.route.district],
+                    "County": [self.route.county],
+                    "Route": [self.route.route],
+                    "Direction": [self.route.direction],
+                    "start_pm": [segment.start_pm],
+                    "end_pm": [segment.end_pm],
+                    "length_mi": [stats["length_mi"]],
+                    "parts": [stats["parts"]],
+                    "vertices": [stats["vertices"]],
+                    "gap_mi": [stats["gap_mi"]],
+                    "geometry": [segment.geometry()],
                 },
-                crs=self.SHNLineGdf.crs,
+                crs=self.route.crs,
             )
 
-            splitted_point_gdf = splitted_point_gdf = points_gdf.iloc[[0, -1]].copy()
+            splitted_point_gdf = segment.to_point_gdf()
 
             return splitted_result_gdf, splitted_point_gdf
 
@@ -0,0 +1,274 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Geod
+from pathlib import Path
+
+DATA_PATH = "data"
+METERS_PER_MILE = 1609.344
+GEOD = Geod(ellps="WGS84")
+
+
+def flatten_lines(geometries):
+    """
+    Flatten (Multi)LineStrings into one coordinate array plus part offsets.
+
+    parameter:
+    geometries: a single geometry or a sequence / GeoSeries of geometries
+
+    return:
+    coords: (N, 2) float64 array of every vertex
+    offsets: (P + 1,) int64 array, part i is coords[offsets[i]:offsets[i + 1]]
+    geom_index: (P,) int64 array mapping each part back to its input geometry
+    """
+    geometries = np.atleast_1d(np.asarray(geometries, dtype=object))
+    parts, geom_index = shapely.get_parts(geometries, return_index=True)
+
+    # drop empty parts so every part owns at least one vertex
+    non_empty = ~shapely.is_empty(parts)
+    parts, geom_index = parts[non_empty], geom_index[non_empty]
+
+    coords, part_index = shapely.get_coordinates(parts, return_index=True)
+    counts = np.bincount(part_index, minlength=len(parts))
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return coords, offsets, geom_index.astype(np.int64)
+
+
+def pm_codes(pointGdf, column):
+    """
+    PM prefix / suffix codes (PMPrefix, PMSuffix) as a compact string array,
+    empty strings when the column is missing.
+    """
+    if column not in pointGdf.columns:
+        return np.full(len(pointGdf), "", dtype="U1")
+    return pointGdf[column].fillna("").astype(str).to_numpy(dtype=str)
+
+
+def edge_lengths(start, end, crs=None):
+    """
+    Length in miles of every edge start[i] -> end[i].
+
+    Geographic (or unknown) CRS uses WGS84 geodesic distance, projected CRS
+    uses planar distance scaled by the CRS axis unit.
+    """
+    if len(start) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    if crs is None or crs.is_geographic:
+        _, _, meters = GEOD.inv(start[:, 0], start[:, 1], end[:, 0], end[:, 1])
+        return np.asarray(meters, dtype=np.float64) / METERS_PER_MILE
+
+    unit_factor = crs.axis_info[0].unit_conversion_factor
+    meters = np.hypot(end[:, 0] - start[:, 0], end[:, 1] - start[:, 1]) * unit_factor
+    return meters / METERS_PER_MILE
+
+
+def endpoint_measures(coords, offsets, point_coords, measure):
+    """
+    Measure (e.g. Odometer) of the PM point nearest to each part's first and
+    last vertex.
+
+    return:
+    (P, 2) array of [start, end] measures
+    """
+    starts = coords[offsets[:-1]]
+    ends = coords[offsets[1:] - 1]
+    endpoints = np.concatenate([starts, ends])
+
+    # nearest PM point to every endpoint, all endpoints at once
+    dist_sq = ((endpoints[:, None, :] - point_coords[None, :, :]) ** 2).sum(axis=2)
+    nearest = measure[np.argmin(dist_sq, axis=1)]
+
+    return np.column_stack([nearest[: len(starts)], nearest[len(starts) :]])
+
+
+def part_arrays(
+    coords, offsets, crs=None, part_measure=None, geom_index=None
+):
+    """
+    Vectorized per-part statistics over flat coordinate arrays.
+
+    Parts are not necessarily stored in route order, so when part_measure
+    (see endpoint_measures) is given they are sorted along the route first,
+    within each geometry of geom_index. Parts with NaN measures keep their
+    stored order.
+
+    return:
+    order: (P,) index of the parts in route order
+    vertices: (P,) vertex count of each part, in route order
+    lengths: (P,) length in miles of each part, in route order
+    gaps: (P - 1,) distance in miles from the end of each part to the start
+          of the next one along the route
+    """
+    n_parts = len(offsets) - 1
+    vertices = np.diff(offsets)
+    if n_parts == 0:
+        return np.zeros(0, dtype=np.int64), vertices, np.zeros(0), np.zeros(0)
+
+    # one pass over all consecutive vertex pairs; pairs that straddle two
+    # parts are dropped, the rest add up to the part lengths
+    edges = edge_lengths(coords[:-1], coords[1:], crs)
+    edge_part = np.repeat(np.arange(n_parts), vertices)[:-1]
+    inside = np.ones(len(edges), dtype=bool)
+    inside[offsets[1:-1] - 1] = False
+
+    lengths = np.bincount(
+        edge_part[inside], weights=edges[inside], minlength=n_parts
+    )
+
+    low_end = coords[offsets[:-1]]
+    high_end = coords[offsets[1:] - 1]
+    if geom_index is None:
+        geom_index = np.zeros(n_parts, dtype=np.int64)
+
+    if part_measure is None:
+        order = np.arange(n_parts)
+    else:
+        # a part whose measure decreases is stored against the route direction
+        reversed_part = part_measure[:, 1] < part_measure[:, 0]
+        low_end, high_end = (
+            np.where(reversed_part[:, None], high_end, low_end),
+            np.where(reversed_part[:, None], low_end, high_end),
+        )
+        order = np.lexsort((part_measure.min(axis=1), geom_index))
+
+    gaps = edge_lengths(high_end[order][:-1], low_end[order][1:], crs)
+
+    return order, vertices[order], lengths[order], gaps
+
+
+def segment_statistics(geometry, crs=None, point_coords=None, measure=None):
+    """
+    計算單一線段（含不連續線段）的長度統計
+
+    參數:
+    geometry: LineString 或 MultiLineString
+    crs: geometry 的 CRS，None 時視為經緯度
+    point_coords, measure: PM 點座標與 Odometer，用來依路線順序排列各部分
+
+    返回:
+    summary: dict，包含 parts, vertices, length_mi, gap_mi
+    parts_df: DataFrame，依路線順序每個部分一列
+    """
+    coords, offsets, _ = flatten_lines(geometry)
+    part_measure = None
+    if point_coords is not None and len(offsets) > 1:
+        part_measure = endpoint_measures(coords, offsets, point_coords, measure)
+    _, vertices, lengths, gaps = part_arrays(coords, offsets, crs, part_measure)
+
+    return statistics_frames(vertices, lengths, gaps)
+
+
+def statistics_frames(vertices, lengths, gaps):
+    """
+    Turn the per-part arrays of part_arrays into the summary dict and the
+    per-part DataFrame shown in the app.
+    """
+    parts_df = pd.DataFrame(
+        {
+            "part": np.arange(1, len(lengths) + 1),
+            "vertices": vertices,
+            "length_mi": lengths,
+            "gap_to_next_mi": np.append(gaps, np.nan)[: len(lengths)],
+        }
+    )
+
+    summary = {
+        "parts": int(len(lengths)),
+        "vertices": int(vertices.sum()),
+        "length_mi": float(lengths.sum()),
+        "gap_mi": float(gaps.sum()),
+    }
+
+    return summary, parts_df
+
+
+def catalog_statistics(dataPath=DATA_PATH):
+    """
+    Length statistics for every route in the catalog, computed in one pass.
+
+    return:
+    DataFrame with one row per route file
+    """
+    records = []
+    geometries = []
+    part_measures = []
+    crs = None
+
+    for line_file in sorted((Path(dataPath) / "line").glob("d*/*_route_*.geojson")):
+        lineGdf = gpd.read_file(line_file)
+        if lineGdf.empty:
+            continue
+        if crs is None:
+            crs = lineGdf.crs
+        elif lineGdf.crs != crs:
+            lineGdf = lineGdf.to_crs(crs)
+
+        county, _, route, direction = line_file.stem.split("_")[:4]
+        district = line_file.parent.name.replace("d", "")
+        geometry = lineGdf.geometry.iloc[0]
+
+        # order the parts along the route by the Odometer of the nearest PM point
+        point_file = (
+            Path(dataPath)
+            / "point"
+            / f"d{district}"
+            / f"{county}_pm_{route}_{direction}.geojson"
+        )
+        coords, offsets, _ = flatten_lines(geometry)
+        if point_file.exists():
+            pointGdf = gpd.read_file(point_file)
+            if crs is not None and pointGdf.crs != crs:
+                pointGdf = pointGdf.to_crs(crs)
+            part_measures.append(
+                endpoint_measures(
+                    coords,
+                    offsets,
+                    np.column_stack([pointGdf.geometry.x, pointGdf.geometry.y]),
+                    pointGdf["Odometer"].to_numpy(dtype=np.float64),
+                )
+            )
+        else:
+            # without PM points the parts keep their stored order
+            print(f"Warning: {point_file} not found, parts kept in stored order")
+            part_measures.append(np.full((len(offsets) - 1, 2), np.nan))
+
+        records.append(
+            {
+                "District": district,
+                "County": county,
+                "Route": route,
+                "Direction": direction,
+            }
+        )
+        geometries.append(geometry)
+
+    columns = ["District", "County", "Route", "Direction"]
+    stat_columns = ["parts", "vertices", "length_mi", "gap_mi"]
+    if not records:
+        return pd.DataFrame(columns=columns + stat_columns)
+
+    coords, offsets, geom_index = flatten_lines(geometries)
+    order, vertices, lengths, gaps = part_arrays(
+        coords, offsets, crs, np.concatenate(part_measures), geom_index
+    )
+
+    # only gaps between parts of the same route count
+    geom_index = geom_index[order]
+    same_route = geom_index[:-1] == geom_index[1:]
+
+    n_routes = len(geometries)
+    result = pd.DataFrame(records, columns=columns)
+    result["parts"] = np.bincount(geom_index, minlength=n_routes)
+    result["vertices"] = np.bincount(
+        geom_index, weights=vertices, minlength=n_routes
+    ).astype(np.int64)
+    result["length_mi"] = np.bincount(geom_index, weights=lengths, minlength=n_routes)
+    result["gap_mi"] = np.bincount(
+        geom_index[:-1][same_route], weights=gaps[same_route], minlength=n_routes
+    )
+
+    return result
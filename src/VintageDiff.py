@@ -0,0 +1,362 @@
+import argparse
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from pathlib import Path
+from src.SegmentStatistics import edge_lengths, pm_codes, segment_statistics
+
+FEET_PER_MILE = 5280.0
+METERS_PER_FOOT = 0.3048
+TOLERANCE_FT = 10.0
+
+ROUTE_COLUMNS = ["District", "County", "Route", "Direction"]
+SUMMARY_COLUMNS = ROUTE_COLUMNS + [
+    "matched",
+    "added",
+    "removed",
+    "changed",
+    "mean_ft",
+    "p95_ft",
+    "max_ft",
+]
+INTERVAL_COLUMNS = ROUTE_COLUMNS + [
+    "kind",
+    "start_pm",
+    "end_pm",
+    "points",
+    "max_ft",
+]
+LINE_COLUMNS = ROUTE_COLUMNS + [
+    "status",
+    "bPM_old",
+    "bPM_new",
+    "ePM_old",
+    "ePM_new",
+    "length_old_mi",
+    "length_new_mi",
+    "shift_ft",
+    "changed",
+]
+
+
+def find_route_files(dataPath, layer="point", district=None):
+    """
+    Map (district, county, route, direction) to the file of each route in
+    the data/line or data/point layer.
+    """
+    infix = "pm" if layer == "point" else "route"
+    district_glob = f"d{district}" if district else "d*"
+    route_files = {}
+    for route_file in (Path(dataPath) / layer).glob(
+        f"{district_glob}/*_{infix}_*.geojson"
+    ):
+        parts = route_file.stem.split("_")
+        if len(parts) < 4:
+            continue
+        county, _, route, direction = parts[:4]
+        key = (route_file.parent.name.replace("d", ""), county, route, direction)
+        route_files[key] = route_file
+    return route_files
+
+
+def load_points(pointFilePath, crs=None):
+    """
+    Read a PM point file into a DataFrame of PMPrefix, PM, PMSuffix, PMc,
+    Odometer, x and y.
+    """
+    pointGdf = gpd.read_file(pointFilePath)
+    if crs is not None and pointGdf.crs is not None and pointGdf.crs != crs:
+        pointGdf = pointGdf.to_crs(crs)
+    points = pd.DataFrame(
+        {
+            "PMPrefix": pm_codes(pointGdf, "PMPrefix"),
+            "PM": pointGdf["PM"].to_numpy(dtype=np.float64),
+            "PMSuffix": pm_codes(pointGdf, "PMSuffix"),
+            "PMc": _pmc(pointGdf),
+            "Odometer": pointGdf["Odometer"].to_numpy(dtype=np.float64),
+            "x": pointGdf.geometry.x.to_numpy(),
+            "y": pointGdf.geometry.y.to_numpy(),
+        }
+    )
+    return points, pointGdf.crs
+
+
+def _pmc(pointGdf):
+    """PM label with its prefix and suffix, e.g. R13.164."""
+    if "PMc" in pointGdf.columns:
+        return pointGdf["PMc"].astype(str).to_numpy()
+    pm = pointGdf["PM"].map("{:.3f}".format).to_numpy(dtype=str)
+    return np.char.add(
+        np.char.add(pm_codes(pointGdf, "PMPrefix"), pm),
+        pm_codes(pointGdf, "PMSuffix"),
+    )
+
+
+def _pm_keys(points):
+    """
+    Alignment key of each point: PM prefix, PM rounded to 0.001 and PM
+    suffix, plus a rank among points that still share that key. The rank
+    follows Odometer and then the coordinates, so it does not depend on the
+    order of the features in the file.
+    """
+    pm_key = np.round(points["PM"].to_numpy() * 1000).astype(np.int64)
+    points = points.assign(pm_key=pm_key)
+    points = points.sort_values(
+        ["PMPrefix", "pm_key", "PMSuffix", "Odometer", "x", "y"], kind="stable"
+    )
+    points["pm_rank"] = points.groupby(
+        ["PMPrefix", "pm_key", "PMSuffix"]
+    ).cumcount()
+    return points
+
+
+def diff_route(oldPoints, newPoints, crs=None, tolerance_ft=TOLERANCE_FT):
+    """
+    Compare the PM points of one route between two data vintages.
+
+    return:
+    summary: dict of per-route displacement statistics
+    intervals: DataFrame of PM intervals whose points moved more than
+               tolerance_ft ("moved"), or exist only in the new ("added") or
+               old ("removed") vintage
+    """
+    matched = _pm_keys(oldPoints).merge(
+        _pm_keys(newPoints),
+        on=["PMPrefix", "pm_key", "PMSuffix", "pm_rank"],
+        how="outer",
+        suffixes=("_old", "_new"),
+        indicator=True,
+    )
+    both = matched[matched["_merge"] == "both"].sort_values("Odometer_new")
+
+    displacement = (
+        edge_lengths(
+            both[["x_old", "y_old"]].to_numpy(),
+            both[["x_new", "y_new"]].to_numpy(),
+            crs,
+        )
+        * FEET_PER_MILE
+    )
+    changed = displacement > tolerance_ft
+
+    has_matches = len(displacement) > 0
+    summary = {
+        "matched": len(both),
+        "added": int((matched["_merge"] == "right_only").sum()),
+        "removed": int((matched["_merge"] == "left_only").sum()),
+        "changed": int(changed.sum()),
+        "mean_ft": float(displacement.mean()) if has_matches else np.nan,
+        "p95_ft": float(np.percentile(displacement, 95)) if has_matches else np.nan,
+        "max_ft": float(displacement.max()) if has_matches else np.nan,
+    }
+
+    # runs of consecutive moved points along the new Odometer
+    moved = _intervals("moved", both["PMc_new"].to_numpy(), changed, displacement)
+
+    # runs of points that exist in only one vintage (e.g. 22.4 renamed to
+    # R22.4), along the Odometer of the vintage that has them
+    new_side = matched[matched["_merge"] != "left_only"].sort_values("Odometer_new")
+    added = _intervals(
+        "added",
+        new_side["PMc_new"].to_numpy(),
+        (new_side["_merge"] == "right_only").to_numpy(),
+    )
+    old_side = matched[matched["_merge"] != "right_only"].sort_values("Odometer_old")
+    removed = _intervals(
+        "removed",
+        old_side["PMc_old"].to_numpy(),
+        (old_side["_merge"] == "left_only").to_numpy(),
+    )
+
+    intervals = pd.concat([moved, added, removed], ignore_index=True)
+
+    return summary, intervals
+
+
+def _intervals(kind, pmc, flags, displacement=None):
+    """
+    PM intervals covering each run of consecutive flagged points. Bounds are
+    reported as PMc so R1.9 and 1.9 stay distinguishable.
+    """
+    padded = np.concatenate([[False], flags, [False]])
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    run_start, run_end = edges[0::2], edges[1::2]
+
+    max_ft = (
+        [displacement[s:e].max() for s, e in zip(run_start, run_end)]
+        if displacement is not None
+        else np.full(len(run_start), np.nan)
+    )
+    return pd.DataFrame(
+        {
+            "kind": kind,
+            "start_pm": pmc[run_start],
+            "end_pm": pmc[run_end - 1],
+            "points": run_end - run_start,
+            "max_ft": max_ft,
+        },
+        columns=INTERVAL_COLUMNS[len(ROUTE_COLUMNS) :],
+    )
+
+
+def _utm_epsg(minx, miny, maxx, maxy):
+    """
+    WGS84 UTM zone EPSG code for a lon / lat extent (much cheaper than
+    GeoSeries.estimate_utm_crs, which queries the PROJ database every call).
+    """
+    lon, lat = (minx + maxx) / 2, (miny + maxy) / 2
+    zone = int((lon + 180) // 6) % 60 + 1
+    return (32600 if lat >= 0 else 32700) + zone
+
+
+def diff_line(oldLineGdf, newLineGdf, tolerance_ft=TOLERANCE_FT):
+    """
+    Compare the line of one route between two data vintages: its bPM / ePM,
+    its length, and how far it moved (Hausdorff distance between vertices).
+    """
+    crs = newLineGdf.crs
+    if crs is not None and oldLineGdf.crs is not None and oldLineGdf.crs != crs:
+        oldLineGdf = oldLineGdf.to_crs(crs)
+    old_line = oldLineGdf.iloc[0]
+    new_line = newLineGdf.iloc[0]
+
+    # measure the shift in a local metric CRS
+    lines = gpd.GeoSeries(
+        [old_line.geometry, new_line.geometry], crs=crs or "OGC:CRS84"
+    )
+    if lines.crs.is_geographic:
+        lines = lines.to_crs(epsg=_utm_epsg(*lines.total_bounds))
+    shift_ft = (
+        lines.iloc[0].hausdorff_distance(lines.iloc[1])
+        * lines.crs.axis_info[0].unit_conversion_factor
+        / METERS_PER_FOOT
+    )
+
+    summary = {
+        "status": "both",
+        "bPM_old": old_line.get("bPM", np.nan),
+        "bPM_new": new_line.get("bPM", np.nan),
+        "ePM_old": old_line.get("ePM", np.nan),
+        "ePM_new": new_line.get("ePM", np.nan),
+        "length_old_mi": segment_statistics(old_line.geometry, crs)[0]["length_mi"],
+        "length_new_mi": segment_statistics(new_line.geometry, crs)[0]["length_mi"],
+        "shift_ft": shift_ft,
+    }
+    summary["changed"] = bool(
+        shift_ft > tolerance_ft
+        or not np.isclose(
+            summary["bPM_old"], summary["bPM_new"], atol=5e-4, equal_nan=True
+        )
+        or not np.isclose(
+            summary["ePM_old"], summary["ePM_new"], atol=5e-4, equal_nan=True
+        )
+    )
+    return summary
+
+
+def compare_vintages(
+    oldDataPath, newDataPath, district=None, tolerance_ft=TOLERANCE_FT
+):
+    """
+    Compare the line and PM point layers of every route in two data directories.
+
+    parameter:
+    oldDataPath / newDataPath: data directories in the data/line and data/point layout
+    district: only compare this district, all districts when None
+    tolerance_ft: displacement above which a point or line counts as changed
+
+    return:
+    summary_df: one row per route with PM point displacement statistics
+    intervals_df: one row per moved, added or removed PM interval
+    lines_df: one row per route with line bPM / ePM, length and shift
+    """
+    old_files = find_route_files(oldDataPath, "point", district)
+    new_files = find_route_files(newDataPath, "point", district)
+
+    summaries = []
+    intervals = []
+    for key in sorted(old_files.keys() | new_files.keys()):
+        route_info = dict(zip(ROUTE_COLUMNS, key))
+
+        if key not in old_files or key not in new_files:
+            points, _ = load_points(old_files.get(key) or new_files.get(key))
+            summaries.append(
+                {
+                    **route_info,
+                    "matched": 0,
+                    "added": len(points) if key in new_files else 0,
+                    "removed": len(points) if key in old_files else 0,
+                    "changed": 0,
+                }
+            )
+            continue
+
+        newPoints, crs = load_points(new_files[key])
+        oldPoints, _ = load_points(old_files[key], crs)
+
+        summary, route_intervals = diff_route(oldPoints, newPoints, crs, tolerance_ft)
+        summaries.append({**route_info, **summary})
+        if not route_intervals.empty:
+            intervals.append(route_intervals.assign(**route_info))
+
+    old_lines = find_route_files(oldDataPath, "line", district)
+    new_lines = find_route_files(newDataPath, "line", district)
+
+    line_summaries = []
+    for key in sorted(old_lines.keys() | new_lines.keys()):
+        route_info = dict(zip(ROUTE_COLUMNS, key))
+
+        if key not in old_lines or key not in new_lines:
+            status = "added" if key in new_lines else "removed"
+            line_summaries.append({**route_info, "status": status, "changed": True})
+            continue
+
+        summary = diff_line(
+            gpd.read_file(old_lines[key]), gpd.read_file(new_lines[key]), tolerance_ft
+        )
+        line_summaries.append({**route_info, **summary})
+
+    summary_df = pd.DataFrame(summaries, columns=SUMMARY_COLUMNS)
+    intervals_df = (
+        pd.concat(intervals, ignore_index=True)[INTERVAL_COLUMNS]
+        if intervals
+        else pd.DataFrame(columns=INTERVAL_COLUMNS)
+    )
+    lines_df = pd.DataFrame(line_summaries, columns=LINE_COLUMNS)
+
+    return summary_df, intervals_df, lines_df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare SHN lines and PM points between two data vintages."
+    )
+    parser.add_argument("old", help="Data directory of the older vintage")
+    parser.add_argument("new", help="Data directory of the newer vintage")
+    parser.add_argument("--district", help="Only compare this district, e.g. 12")
+    parser.add_argument(
+        "--tolerance-ft",
+        type=float,
+        default=TOLERANCE_FT,
+        help="Displacement in feet above which a point or line counts as changed",
+    )
+    parser.add_argument("--output", help="Directory to write the CSV reports to")
+    args = parser.parse_args()
+
+    summary_df, intervals_df, lines_df = compare_vintages(
+        args.old, args.new, district=args.district, tolerance_ft=args.tolerance_ft
+    )
+
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(summary_df.to_string(index=False))
+        print()
+        print(intervals_df.to_string(index=False))
+        print()
+        print(lines_df.to_string(index=False))
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.mkdir(parents=True, exist_ok=True)
+        summary_df.to_csv(output_path / "vintage_summary.csv", index=False)
+        intervals_df.to_csv(output_path / "vintage_intervals.csv", index=False)
+        lines_df.to_csv(output_path / "vintage_lines.csv", index=False)